@@ -12,18 +12,58 @@ To deploy:
 """
 
 import os
+import csv
+import hashlib
+import io
+import asyncio
 import streamlit as st
+import orjson
 import requests
-import pandas as pd
-import json
-import time
-from typing import Any, Dict, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    import aiohttp
 
 # ---------- Config ----------
 API_URL = "https://decryptkarnrwalebkl.wasmer.app/"
 API_KEY = os.getenv("API_KEY", None)
 TERM_PARAM = "term"
 KEY_PARAM = "key"
+# Static part of the lookup URL, built once per script run; only the term is appended per call.
+_BASE_WITH_KEY = f"{API_URL}?{KEY_PARAM}={quote(API_KEY, safe='')}&{TERM_PARAM}=" if API_KEY else None
+USER_AGENT = "NumInfo/1.0 (+streamlit)"
+CONNECT_TIMEOUT = 3
+MAX_BATCH_TERMS = 100
+
+CSS = """
+<style>
+.card {background: linear-gradient(180deg,#ffffff,#f3f4f6);
+       padding:12px; border-radius:10px;
+       box-shadow:0 6px 18px rgba(15,23,42,0.06); margin-bottom:8px;}
+.key {font-weight:700; color:#0b1220; margin-bottom:6px;}
+.val {font-weight:600; color:#064e3b;}
+.small {font-size:0.9rem; color:#475569;}
+</style>
+"""
+CARD_TMPL = "<div class='card'><div class='key'>{k}</div><div class='val'>{v}</div></div>"
+
+# Display field -> accepted API keys, earlier aliases take precedence.
+FIELD_ALIASES = {
+    "name": ["name", "fullname", "user"],
+    "fname": ["father_name", "fname", "parent"],
+    "mobile": ["mobile", "phone", "number"],
+    "email": ["email", "mail"],
+    "circle": ["circle", "region", "area"],
+    "address": ["address", "location"],
+}
+_ALIAS_TO_CANON = {
+    alias: (out_key, rank)
+    for out_key, aliases in FIELD_ALIASES.items()
+    for rank, alias in enumerate(aliases)
+}
 
 # ---------- Streamlit setup ----------
 st.set_page_config(page_title="NumInfo — DecryptKarn API", layout="wide")
@@ -37,6 +77,7 @@ st.sidebar.title("⚙️ Settings")
 use_mock = st.sidebar.checkbox("Use mock data (no network)", value=False)
 timeout = st.sidebar.number_input("HTTP Timeout (s)", 5, 30, 10)
 auto_map = st.sidebar.checkbox("Auto-map fields for better display", value=True)
+clear_cache = st.sidebar.button("🧹 Clear cache")
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("🔒 **API key:** stored securely in Render as an environment variable.")
@@ -46,25 +87,31 @@ if not API_KEY and not use_mock:
     st.stop()
 
 # ---------- Styles ----------
-st.markdown("""
-<style>
-.card {background: linear-gradient(180deg,#ffffff,#f3f4f6);
-       padding:12px; border-radius:10px;
-       box-shadow:0 6px 18px rgba(15,23,42,0.06); margin-bottom:8px;}
-.key {font-weight:700; color:#0b1220; margin-bottom:6px;}
-.val {font-weight:600; color:#064e3b;}
-.small {font-size:0.9rem; color:#475569;}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(CSS, unsafe_allow_html=True)
 
 # ---------- Input ----------
-col1, col2 = st.columns([3, 1])
-with col1:
+with st.form("lookup_form"):
     term = st.text_input("Enter search term (phone number / ID / keyword)", placeholder="e.g. F or +919876543210")
-with col2:
-    lookup = st.button("🔍 Lookup")
+    submitted = st.form_submit_button("🔍 Lookup")
 
 # ---------- Helpers ----------
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Shared HTTP session, kept alive across reruns for connection reuse."""
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    # Retry connect errors and transient statuses only; a read timeout fails fast
+    # and Retry-After can't stretch the wait beyond our own backoff.
+    retry = Retry(total=3, read=0, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(["GET"]), raise_on_status=False,
+                  respect_retry_after_header=False)
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry))
+    return session
+
+def _stable_idx(s: str, n: int) -> int:
+    # Builtin hash() is salted per process; keep mock rows stable across workers.
+    return int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") % n
+
 def mock_lookup(term_value: str) -> Dict[str, Any]:
     samples = [
         {"name": "Rahul Kumar", "fname": "Suresh Kumar", "mobile": term_value,
@@ -73,45 +120,112 @@ def mock_lookup(term_value: str) -> Dict[str, Any]:
          "email": "priya.sh@example.com", "address": "Mumbai"},
         {"name": "Unknown", "mobile": term_value, "address": "Unknown", "note": "No data found"},
     ]
-    return samples[hash(term_value) % len(samples)]
+    return samples[_stable_idx(term_value, len(samples))]
 
 def call_api(term_value: str, timeout: int) -> Tuple[Dict[str, Any], int]:
-    params = {KEY_PARAM: API_KEY, TERM_PARAM: term_value}
-    response = requests.get(API_URL, params=params, timeout=timeout)
+    url = _BASE_WITH_KEY + quote(term_value, safe="")
+    response = get_session().get(url, timeout=(CONNECT_TIMEOUT, timeout))
     status = response.status_code
     try:
-        data = response.json()
-    except ValueError:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
         data = {"text": response.text}
     if isinstance(data, list):
         data = {"results": data}
     return data, status
 
+class UncachedResponse(Exception):
+    """Non-2xx lookup result; raised out of fetch so st.cache_data won't store it."""
+
+    def __init__(self, data: Dict[str, Any], status: int):
+        super().__init__(f"HTTP {status}")
+        self.data = data
+        self.status = status
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch(term_value: str, _timeout: int) -> Tuple[Dict[str, Any], int]:
+    """Cached wrapper around call_api; only successful lookups are memoized.
+
+    The leading underscore keeps the timeout out of the cache key, so results
+    are keyed on the term alone.
+    """
+    data, status = call_api(term_value, _timeout)
+    if not 200 <= status < 300:
+        raise UncachedResponse(data, status)
+    return data, status
+
+if clear_cache:
+    fetch.clear()
+    st.session_state.pop("last_result", None)
+
+async def _fetch(session: "aiohttp.ClientSession", term_value: str,
+                 timeout: "aiohttp.ClientTimeout") -> Tuple[Dict[str, Any], Optional[int]]:
+    # Network errors propagate to fetch_many, which turns them into error rows.
+    params = {KEY_PARAM: API_KEY, TERM_PARAM: term_value}
+    async with session.get(API_URL, params=params, timeout=timeout) as response:
+        status = response.status
+        body = await response.read()
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        data = {"text": body.decode("utf-8", "replace")}
+    if isinstance(data, list):
+        data = {"results": data}
+    return data, status
+
+async def fetch_many(terms: List[str], timeout: int) -> List[Tuple[Dict[str, Any], Optional[int]]]:
+    """Look up all terms concurrently over one pooled connector."""
+    import aiohttp  # only needed in batch mode; keep it off the cold-start path
+    connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+    # Time the socket phases only, so waiting for a free pooled connection doesn't count.
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=timeout)
+    async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT}) as session:
+        results = await asyncio.gather(*(_fetch(session, t, client_timeout) for t in terms),
+                                       return_exceptions=True)
+    # One failing term must not discard the others' results.
+    return [({"error": str(r) or type(r).__name__}, None) if isinstance(r, BaseException) else r
+            for r in results]
+
+def to_csv_bytes(result: Any) -> bytes:
+    """Serialize a result (single record or list of records) to CSV bytes."""
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        rows = result["results"]
+    elif isinstance(result, dict):
+        rows = [result]
+    else:
+        rows = result
+    rows = [r if isinstance(r, dict) else {"value": r} for r in rows]
+    keys = list(dict.fromkeys(k for r in rows for k in r))
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(keys)
+    writer.writerows([r.get(k, "") for k in keys] for r in rows)
+    return buf.getvalue().encode("utf-8")
+
 def auto_map_fields(data: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(data, dict):
         return {"raw": data}
-    mapping = {
-        "name": ["name", "fullname", "user"],
-        "fname": ["father_name", "fname", "parent"],
-        "mobile": ["mobile", "phone", "number"],
-        "email": ["email", "mail"],
-        "circle": ["circle", "region", "area"],
-        "address": ["address", "location"],
-    }
-    mapped = {}
-    for out_key, keys in mapping.items():
-        for k in keys:
-            if k in data and data[k]:
-                mapped[out_key] = data[k]
-                break
-    others = {k: v for k, v in data.items() if k not in mapped}
+    mapped, sources = {}, {}
+    for k, v in data.items():
+        hit = _ALIAS_TO_CANON.get(k)
+        if hit is None or not v:
+            continue
+        out_key, rank = hit
+        if out_key not in sources or rank < _ALIAS_TO_CANON[sources[out_key]][1]:
+            mapped[out_key] = v
+            sources[out_key] = k
+    mapped = {out_key: mapped[out_key] for out_key in FIELD_ALIASES if out_key in mapped}
+    # Only the keys that actually fed a display field are left out of "others".
+    consumed = set(sources.values())
+    others = {k: v for k, v in data.items() if k not in consumed}
     if others:
         mapped["others"] = others
     return mapped
 
 # ---------- Lookup ----------
-if lookup:
+if submitted:
     if not term:
+        st.session_state.pop("last_result", None)
         st.error("❌ Please enter a search term.")
     else:
         with st.spinner("Fetching data..."):
@@ -120,8 +234,9 @@ if lookup:
                     result = mock_lookup(term)
                     status = 200
                 else:
-                    result, status = call_api(term, timeout)
-                time.sleep(0.3)
+                    result, status = fetch(term, timeout)
+            except UncachedResponse as e:
+                result, status = e.data, e.status
             except requests.RequestException as e:
                 result = {"error": str(e)}
                 status = getattr(e.response, "status_code", None)
@@ -129,31 +244,79 @@ if lookup:
                 result = {"error": str(e)}
                 status = None
 
-        st.info(f"API Response Status: {status if status else 'N/A'}")
-
-        colL, colR = st.columns([2, 1])
-        with colL:
-            st.subheader("📋 Summary")
-            display = auto_map_fields(result) if auto_map else result
-            for key in ("name", "fname", "mobile", "email", "circle", "address"):
-                if key in display:
-                    val = display.get(key) or "N/A"
-                    st.markdown(f"<div class='card'><div class='key'>{key.capitalize()}</div><div class='val'>{val}</div></div>", unsafe_allow_html=True)
-            if "others" in display:
-                with st.expander("Other Fields"):
-                    st.json(display["others"])
-
-        with colR:
-            st.subheader("🧾 Raw JSON")
-            st.json(result)
-
-        # CSV download
+        # CSV is built once per lookup, not on every rerun.
         try:
-            df = pd.DataFrame([result]) if isinstance(result, dict) else pd.DataFrame(result)
-            csv_bytes = df.to_csv(index=False).encode("utf-8")
-            st.download_button("⬇️ Download CSV", csv_bytes, file_name=f"numinfo_{term}.csv", mime="text/csv")
+            csv_bytes, csv_error = to_csv_bytes(result), None
         except Exception as e:
-            st.warning(f"Could not generate CSV: {e}")
+            csv_bytes, csv_error = None, e
+
+        st.session_state.last_result = {
+            "term": term, "result": result, "status": status,
+            "csv_bytes": csv_bytes, "csv_error": csv_error,
+        }
+
+# Re-render the last lookup from state so unrelated widget changes don't refetch.
+last = st.session_state.get("last_result")
+if last:
+    result, status = last["result"], last["status"]
+
+    st.info(f"API Response Status: {status if status else 'N/A'}")
+
+    colL, colR = st.columns([2, 1])
+    with colL:
+        st.subheader("📋 Summary")
+        if auto_map:
+            # Mapped view is computed once per lookup and reused across reruns.
+            if "mapped" not in last:
+                last["mapped"] = auto_map_fields(result)
+            display = last["mapped"]
+        else:
+            display = result
+        html_parts = []
+        for key in FIELD_ALIASES:
+            if key in display:
+                val = display.get(key) or "N/A"
+                html_parts.append(CARD_TMPL.format(k=key.capitalize(), v=val))
+        if html_parts:
+            st.markdown("".join(html_parts), unsafe_allow_html=True)
+        if "others" in display:
+            with st.expander("Other Fields"):
+                st.json(display["others"])
+
+    with colR:
+        st.subheader("🧾 Raw JSON")
+        st.json(result)
+
+    # CSV download
+    if last["csv_error"] is None:
+        st.download_button("⬇️ Download CSV", last["csv_bytes"], file_name=f"numinfo_{last['term']}.csv", mime="text/csv")
+    else:
+        st.warning(f"Could not generate CSV: {last['csv_error']}")
+
+# ---------- Batch lookup ----------
+with st.expander("📦 Batch lookup (one term per line)"):
+    batch_text = st.text_area("Search terms", placeholder="+919876543210\n+919812345678")
+    batch_lookup = st.button("🔍 Lookup all")
+
+if batch_lookup:
+    terms = list(dict.fromkeys(t.strip() for t in batch_text.splitlines() if t.strip()))
+    if len(terms) > MAX_BATCH_TERMS:
+        st.warning(f"⚠️ Only the first {MAX_BATCH_TERMS} of {len(terms)} terms will be looked up.")
+        terms = terms[:MAX_BATCH_TERMS]
+    if not terms:
+        st.error("❌ Please enter at least one search term.")
+    else:
+        with st.spinner(f"Fetching {len(terms)} terms..."):
+            if use_mock:
+                batch = [(mock_lookup(t), 200) for t in terms]
+            else:
+                try:
+                    batch = asyncio.run(fetch_many(terms, timeout))
+                except Exception as e:
+                    batch = [({"error": str(e)}, None)] * len(terms)
+        for t, (result, status) in zip(terms, batch):
+            with st.expander(f"{t} — status {status if status else 'N/A'}"):
+                st.json(result)
 
 st.markdown("---")
 st.caption("🔐 API key is securely loaded from the environment (Render.com → Environment → API_KEY).")